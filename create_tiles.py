@@ -8,7 +8,8 @@ def main():
     point_3 = Vertex(sqrt(2) / 2, - 1 / sqrt(6), (sqrt(2) + 1) / sqrt(3))
 
     tiling = Tiling(point_1, point_2, point_3)
-    tiling.create_tiles(depth=6)
+    # draw.py renders every depth
+    tiling.create_tiles(depth=6, save_all_depths=True)
 
 
 if __name__ == "__main__":
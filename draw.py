@@ -1,30 +1,55 @@
 import os
-import tqdm
+import pickle
 
 import yaml
-from drawSvg import Drawing
 
 from tiling import Tile
 
 colour_values = ["#ffffff", "#000000", "#cc6600", "#66cc00"]
 
+render_size = 4096
+
+svg_header = """<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     width="{size}" height="{size}" viewBox="-1 -1 2 2">
+"""
+
 
 def _draw_from_data(depth: int, path: str):
     print(f"Loading data for depth {depth}...")
 
-    with open(os.path.join(path, 'logo-depth-{}-data.yaml'.format(depth)), 'r') as f:
-        data = yaml.safe_load(f)
-        data = {Tile.from_json(key): value for key, value in data}
+    data_path = os.path.join(path, 'logo-depth-{}-data.pkl'.format(depth))
+
+    if os.path.exists(data_path):
+        with open(data_path, 'rb') as f:
+            data = pickle.load(f)
+    else:
+        with open(os.path.join(path, 'logo-depth-{}-data.yaml'.format(depth)), 'r') as f:
+            data = yaml.safe_load(f)
+
+    # shared vertices are loaded once, so edges of neighbouring tiles compare by identity
+    vertices = {}
+    data = {Tile.from_json(key, vertices): value for key, value in data}
 
     print("Loaded. Drawing...")
 
-    drawing = Drawing(2, 2, origin='center')
-    drawing.setRenderSize(4096)
+    # tiles of one colour are drawn as the sub-paths of a single path
+    colour_paths = [[] for _ in colour_values]
+    radii = {}
+
+    for tile, colour_index in data.items():
+        colour_paths[colour_index].append(tile.to_svg_path(radii))
+
+    parts = [svg_header.format(size=render_size)]
+
+    for colour, tile_paths in zip(colour_values, colour_paths):
+        if tile_paths:
+            parts.append('<path d="{}" fill="{}" />\n'.format(" ".join(tile_paths), colour))
 
-    for tile, colour_index in tqdm.tqdm(data.items()):
-        drawing.draw(tile, fill=colour_values[colour_index])
+    parts.append("</svg>\n")
 
-    drawing.saveSvg(os.path.join(path, 'logo-depth-{}.svg'.format(depth)))
+    with open(os.path.join(path, 'logo-depth-{}.svg'.format(depth)), 'w') as f:
+        f.write("".join(parts))
 
     print("Drawn.")
 
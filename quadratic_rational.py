@@ -1,13 +1,67 @@
 import numpy as np
+from functools import lru_cache
 from typing import Tuple, Union
 import math
 
 
+class Basis:
+	__slots__ = ("products", "mul_table", "sqrt_products", "_indices", "_embeddings")
+
+	def __init__(self, products: np.ndarray):
+		self.products = tuple(int(product) for product in products.flatten())
+		self.sqrt_products = tuple(math.sqrt(product) for product in self.products)
+		self._indices = {product: index for index, product in enumerate(self.products)}
+		self._embeddings = {}
+
+		# sqrt(products[i]) * sqrt(products[j]) == factor * sqrt(products[m]), where mul_table[i][j] == (m, factor)
+		self.mul_table = tuple(
+			tuple(self._multiply_products(product_1, product_2) for product_2 in self.products)
+			for product_1 in self.products
+		)
+
+	def _multiply_products(self, product_1: int, product_2: int) -> Tuple[int, int]:
+		gcd = math.gcd(product_1, product_2)
+		return self._indices[product_1 * product_2 // gcd ** 2], gcd
+
+	def embedding(self, other: "Basis") -> Tuple[int, ...]:
+		# index of each of self.products in other.products, -1 where it is missing
+		if other not in self._embeddings:
+			self._embeddings[other] = tuple(other._indices.get(product, -1) for product in self.products)
+
+		return self._embeddings[other]
+
+
+def _add_coefficients(coefficients_1: Tuple[int, ...], coefficients_2: Tuple[int, ...]) -> Tuple[int, ...]:
+	return tuple(coefficient_1 + coefficient_2 for coefficient_1, coefficient_2 in zip(coefficients_1, coefficients_2))
+
+
+def _mul_coefficients(coefficients_1: Tuple[int, ...], coefficients_2: Tuple[int, ...], mul_table) -> Tuple[int, ...]:
+	result = [0] * len(coefficients_1)
+
+	for coefficient_1, row in zip(coefficients_1, mul_table):
+		if coefficient_1 == 0:
+			continue
+
+		for coefficient_2, (index, factor) in zip(coefficients_2, row):
+			if coefficient_2 != 0:
+				result[index] += factor * coefficient_1 * coefficient_2
+
+	return tuple(result)
+
+
+def _conjugate_coefficients(coefficients: Tuple[int, ...]) -> Tuple[int, ...]:
+	# negates the terms containing the smallest basis number, which sit at the odd indices
+	return tuple(-coefficient if index & 1 else coefficient for index, coefficient in enumerate(coefficients))
+
+
 class QuadraticIntegerMeta(type):
 	__cache__ = {}
+	__union_cache__ = {}
+	__subclass_cache__ = {}
 
 	def __new__(mcs, name, bases, attributes, **kwargs):
 		if attributes["__numbers__"] not in mcs.__cache__:
+			attributes["__basis__"] = Basis(attributes["__products__"])
 			mcs.__cache__[attributes["__numbers__"]] = super().__new__(mcs, name, bases, attributes, **kwargs)
 
 		return mcs.__cache__[attributes["__numbers__"]]
@@ -16,28 +70,39 @@ class QuadraticIntegerMeta(type):
 		if not isinstance(numbers, tuple):
 			numbers = (numbers,)
 
+		key = (cls, numbers)
+		if key in cls.__subclass_cache__:
+			return cls.__subclass_cache__[key]
+
 		products = cls._get_products_from_numbers(numbers)
-		products = cls._get_products_from_numbers(tuple(products.flatten()))
+
+		# a second pass over the products picks the smallest generators; when the products
+		# already come out sorted it would pick the same ones again
+		flat_products = products.flatten().tolist()
+		if flat_products != sorted(flat_products):
+			products = cls._get_products_from_numbers(tuple(flat_products))
+
 		numbers = cls._get_numbers_from_products(products)
 		
-		return type(cls)(
+		cls.__subclass_cache__[key] = type(cls)(
 			f"{cls.__name__}[{', '.join([str(number) for number in numbers])}]",
 			(cls,),
-			{"__numbers__": numbers, "__products__": products},
+			{"__numbers__": numbers, "__products__": products, "__slots__": ()},
 		)
+		return cls.__subclass_cache__[key]
 		
 	def _get_products_from_numbers(cls, numbers: Tuple[int, ...]) -> np.ndarray:
-		products = np.array(1)
+		products = [1]
+		size = 0
 
 		for number in sorted(numbers):
 			if number in products:
 				continue
 
-			gcd = np.gcd(products, number)
-			products = products[None] * np.array([1, number]).reshape((2,) + (1,) * products.ndim)
-			products[1] //= gcd ** 2
+			products += [product * number // math.gcd(product, number) ** 2 for product in products]
+			size += 1
 
-		return products
+		return np.array(products, dtype=np.int64).reshape((2,) * size)
 
 	def _get_numbers_from_products(cls, products: np.ndarray) -> Tuple[int, ...]:
 		numbers = []
@@ -45,59 +110,90 @@ class QuadraticIntegerMeta(type):
 		for axis in range(products.ndim):
 			index = [0] * products.ndim
 			index[axis] = 1
-			numbers.append(products[tuple(index)])
+			numbers.append(int(products[tuple(index)]))
 		
 		return tuple(reversed(tuple(numbers)))
 
+	def union(cls, other: "QuadraticIntegerMeta") -> "QuadraticIntegerMeta":
+		key = (cls, other)
+
+		if key not in cls.__union_cache__:
+			cls.__union_cache__[key] = QuadraticInteger[cls.__basis__.products + other.__basis__.products]
+
+		return cls.__union_cache__[key]
+
 
 class QuadraticInteger(metaclass=QuadraticIntegerMeta):
 	__numbers__ = ()
 	__products__ = np.array(1)
-	__slots__ = ("coefficients", "value")
+	__slots__ = ("coefficients", "_value", "_reduced")
 
-	def __init__(self, coefficients: np.ndarray):
-		assert coefficients.shape == self.__products__.shape
+	def __init__(self, coefficients: Tuple[int, ...]):
+		assert len(coefficients) == len(self.__basis__.products)
 		self.coefficients = coefficients
-		self.value = np.sum(self.coefficients * np.sqrt(self.__products__))
+
+		self._value = None
+		self._reduced = None
+
+	@property
+	def value(self) -> float:
+		if self._value is None:
+			self._value = sum(coefficient * sqrt_product for coefficient, sqrt_product in zip(self.coefficients, self.__basis__.sqrt_products))
+
+		return self._value
 	
 	def as_int(self) -> int:
-		assert self.__products__.ndim == 0, "{self} cannot be represented as an integer"
-		return int(self.coefficients)
+		reduced = self.reduce()
+		assert reduced.__products__.ndim == 0, "{self} cannot be represented as an integer"
+		return reduced.coefficients[0]
 
 	@staticmethod
 	def convert(number: Union[int, "QuadraticInteger"]) -> "QuadraticInteger":
 		if not isinstance(number, QuadraticInteger):
-			return QuadraticInteger(np.array(number))
+			return QuadraticInteger((int(number),))
 		return number
 
 	def rebase(self, numbers: Tuple[int, ...]) -> "QuadraticInteger":
-		new_quadratic_integer = QuadraticInteger[numbers]
+		return self._rebase_to(QuadraticInteger[numbers])
 
-		self_products = self.__products__
-		new_products = new_quadratic_integer.__products__
+	def _rebase_to(self, new_quadratic_integer: QuadraticIntegerMeta) -> "QuadraticInteger":
+		if type(self) is new_quadratic_integer:
+			return self
 
-		products_mapping = new_products.reshape(new_products.shape + (1,) * self_products.ndim) == self_products
-		assert np.all(products_mapping.sum(axis=tuple(range(new_products.ndim))) >= (self.coefficients != 0))
-		
-		new_coefficients = np.sum(self.coefficients * products_mapping, axis=tuple(range(-self_products.ndim, 0)))
-		return new_quadratic_integer(new_coefficients)
+		new_coefficients = [0] * len(new_quadratic_integer.__basis__.products)
+
+		for coefficient, index in zip(self.coefficients, self.__basis__.embedding(new_quadratic_integer.__basis__)):
+			if index >= 0:
+				new_coefficients[index] = coefficient
+			else:
+				assert coefficient == 0
+
+		return new_quadratic_integer(tuple(new_coefficients))
 
 	def reduce(self) -> "QuadraticInteger":
-		numbers = self.__products__[self.coefficients != 0]
-		return self.rebase(tuple(numbers.flatten()))
+		# _reduced is True when self is already reduced, otherwise it caches the reduced copy
+		if self._reduced is None:
+			if all(self.coefficients):
+				self._reduced = True
+			else:
+				numbers = tuple(product for product, coefficient in zip(self.__basis__.products, self.coefficients) if coefficient != 0)
+
+				self._reduced = self.rebase(numbers)
+				self._reduced._reduced = True
+
+		return self if self._reduced is True else self._reduced
 
 	def __neg__(self) -> "QuadraticInteger":
-		return type(self)(-self.coefficients)
+		return type(self)(tuple(-coefficient for coefficient in self.coefficients))
 	
 	def __add__(self, other: Union[int, "QuadraticInteger"]) -> "QuadraticInteger":
 		other = QuadraticInteger.convert(other)
+		new_quadratic_integer = type(self).union(type(other))
 
-		new_numbers = tuple(self.__products__.flatten()) + tuple(other.__products__.flatten())
-		
-		summand_1 = self.rebase(new_numbers)
-		summand_2 = other.rebase(new_numbers)
+		summand_1 = self._rebase_to(new_quadratic_integer)
+		summand_2 = other._rebase_to(new_quadratic_integer)
 		
-		return type(summand_1)(summand_1.coefficients + summand_2.coefficients).reduce()
+		return new_quadratic_integer(_add_coefficients(summand_1.coefficients, summand_2.coefficients))
 
 	def __radd__(self, other: Union[int, "QuadraticInteger"]) -> "QuadraticInteger":
 		return self + other
@@ -110,23 +206,14 @@ class QuadraticInteger(metaclass=QuadraticIntegerMeta):
 
 	def __mul__(self, other: Union[int, "QuadraticInteger"]) -> "QuadraticInteger":
 		other = QuadraticInteger.convert(other)
+		new_quadratic_integer = type(self).union(type(other))
 
-		new_numbers = tuple(self.__products__.flatten()) + tuple(other.__products__.flatten())
-		
-		factor_1 = self.rebase(new_numbers)
-		factor_2 = other.rebase(new_numbers)
+		factor_1 = self._rebase_to(new_quadratic_integer)
+		factor_2 = other._rebase_to(new_quadratic_integer)
 
-		products = factor_1.__products__
-		products_reshaped = factor_2.__products__.reshape(factor_2.__products__.shape + (1,) * factor_1.__products__.ndim)
-		
-		products_gcd = np.gcd(products, products_reshaped)
-		products_overall = products * products_reshaped // products_gcd ** 2
-		result = (products.reshape(products.shape + (1,) * products_gcd.ndim) == products_overall) * products_gcd
-		
-		result = np.sum(result * factor_1.coefficients, axis=tuple(range(-products.ndim, 0)))
-		result = np.sum(result * factor_2.coefficients, axis=tuple(range(-products.ndim, 0)))
+		result = _mul_coefficients(factor_1.coefficients, factor_2.coefficients, new_quadratic_integer.__basis__.mul_table)
 		
-		return type(factor_1)(result).reduce()
+		return new_quadratic_integer(result)
 
 	def __rmul__(self, other: Union[int, "QuadraticInteger"]) -> "QuadraticInteger":
 		return self * other
@@ -139,7 +226,7 @@ class QuadraticInteger(metaclass=QuadraticIntegerMeta):
 
 	def __pow__(self, exponent: int) -> "QuadraticInteger":
 		if exponent == 0:
-			return QuadraticInteger.convert(1)
+			return ONE
 
 		if exponent < 0:
 			return 1 / (self ** -exponent)
@@ -152,21 +239,25 @@ class QuadraticInteger(metaclass=QuadraticIntegerMeta):
 		return half_power * half_power * self
 	
 	def __eq__(self, other: Union[int, "QuadraticInteger"]) -> bool:
+		if type(self) is type(other):
+			return self.coefficients == other.coefficients
+
 		other = QuadraticInteger.convert(other)
-		return np.all(self.__products__ == other.__products__) and np.all(self.coefficients == other.coefficients)
+		new_quadratic_integer = type(self).union(type(other))
+
+		return self._rebase_to(new_quadratic_integer).coefficients == other._rebase_to(new_quadratic_integer).coefficients
 	
 	def __hash__(self) -> int:
-		return hash(
-			(
-				tuple(self.__products__.flatten()),
-				tuple(self.coefficients.flatten()),
-			)
-		)
+		return hash(self._canonical_tuple())
+
+	def _canonical_tuple(self) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+		reduced = self.reduce()
+		return (reduced.__basis__.products, reduced.coefficients)
 
 	def __repr__(self) -> str:
 		res = ""
 		
-		for coefficient, product in zip(self.coefficients.flatten(), self.__products__.flatten()):
+		for coefficient, product in zip(self.coefficients, self.__basis__.products):
 			if coefficient == 0:
 				continue
 			
@@ -196,24 +287,28 @@ class QuadraticInteger(metaclass=QuadraticIntegerMeta):
 		return int(data)
 
 	def to_json(self):
-		return {"numbers": self._convert_to_int(self.__numbers__), "coefficients": self._convert_to_int(self.coefficients.tolist())}
+		reduced = self.reduce()
+		return {"numbers": self._convert_to_int(reduced.__numbers__), "coefficients": self._convert_to_int(reduced.coefficients)}
 
 	@classmethod
 	def from_json(cls, data: dict):
 		klass = cls if len(data["numbers"]) == 0 else cls[tuple(data["numbers"])]
-		return klass(np.array(data["coefficients"], dtype=np.int64))
+		# older data stores the coefficients nested in the shape of __products__
+		return klass(tuple(int(coefficient) for coefficient in np.array(data["coefficients"]).flatten()))
 
 
 class QuadraticRational:
-	__slots__ = ("numerator", "denominator", "value")
+	__slots__ = ("numerator", "denominator", "_value")
 
 	def __init__(self, numerator: Union[int, QuadraticInteger], denominator: Union[int, QuadraticInteger]):
 		if isinstance(denominator, QuadraticInteger):
+			denominator = denominator.reduce()
+
 			while denominator.__products__.ndim > 0:
-				factor = type(denominator)(denominator.coefficients * np.array([1, -1]))
+				factor = type(denominator)(_conjugate_coefficients(denominator.coefficients))
 				
 				numerator = numerator * factor
-				denominator = denominator * factor
+				denominator = (denominator * factor).reduce()
 		
 			denominator = denominator.as_int()
 
@@ -225,22 +320,23 @@ class QuadraticRational:
 
 		self.numerator = numerator
 		self.denominator = denominator
-		self.value = self.numerator.value / self.denominator
+		self._value = None
 
 		self._reduce_fraction()
 
-	def _reduce_fraction(self):
-		numerator_gcd = self.numerator.coefficients
-		while isinstance(numerator_gcd, np.ndarray) and numerator_gcd.ndim > 0:
-			numerator_gcd = np.gcd(numerator_gcd[0], numerator_gcd[1])
+	@property
+	def value(self) -> float:
+		if self._value is None:
+			self._value = self.numerator.value / self.denominator
+
+		return self._value
 
-		try:
-			factor = int(math.gcd(numerator_gcd, self.denominator))
-		except:
-			raise ValueError(self.numerator, self.denominator, numerator_gcd)
+	def _reduce_fraction(self):
+		factor = math.gcd(*self.numerator.coefficients, self.denominator)
 
-		self.numerator.coefficients //= factor
-		self.denominator //= factor
+		if factor > 1:
+			self.numerator = type(self.numerator)(tuple(coefficient // factor for coefficient in self.numerator.coefficients))
+			self.denominator //= factor
 	
 	@staticmethod
 	def convert(number: Union[int, QuadraticInteger, "QuadraticRational"]):
@@ -296,32 +392,41 @@ class QuadraticRational:
 		return other / self
 
 	def __pow__(self, exponent: int):
-		if exponent == 0:
-			return QuadraticRational.convert(1)
-
 		if exponent < 0:
 			return 1 / (self ** -exponent)
 
-		half_exponent = exponent // 2
-		half_power = self ** half_exponent
+		numerator, denominator = ONE, 1
+		base_numerator, base_denominator = self.numerator, self.denominator
 
-		if exponent % 2 == 0:
-			return half_power * half_power
-		return half_power * half_power * self
+		while exponent:
+			if exponent & 1:
+				numerator = numerator * base_numerator
+				denominator = denominator * base_denominator
+
+			exponent >>= 1
+
+			if exponent:
+				base_numerator = base_numerator * base_numerator
+				base_denominator = base_denominator * base_denominator
+
+		return QuadraticRational(numerator, denominator)
 
 	def __eq__(self, other: Union[int, QuadraticInteger, "QuadraticRational"]):
 		other = QuadraticRational.convert(other)
 		return self.numerator == other.numerator and self.denominator == other.denominator
 	
 	def __hash__(self) -> int:
-		return hash((self.numerator, self.denominator))
+		return hash(self._canonical_tuple())
+
+	def _canonical_tuple(self) -> tuple:
+		return (self.numerator._canonical_tuple(), self.denominator)
 
 	def __repr__(self) -> str:
 		if self.denominator == 1:
 			return f"{self.numerator}"
 
 		numerator_str = f"{self.numerator}"
-		if np.sum(self.numerator.coefficients != 0) > 1:
+		if sum(coefficient != 0 for coefficient in self.numerator.coefficients) > 1:
 			numerator_str = f"({self.numerator})"
 		
 		return f"{numerator_str} / {self.denominator}"
@@ -334,6 +439,7 @@ class QuadraticRational:
 		return cls(numerator=QuadraticInteger.from_json(data["numerator"]), denominator=data["denominator"])
 
 
+@lru_cache(maxsize=None)
 def sqrt(number: int) -> QuadraticInteger:
 	coefficient = 1
 
@@ -344,5 +450,8 @@ def sqrt(number: int) -> QuadraticInteger:
 			number //= n * n
 		n += 1
 
-	return QuadraticInteger[number](np.array([0, coefficient]))
+	return QuadraticInteger[number]((0, coefficient))
+
 
+ONE = QuadraticInteger.convert(1)
+SQRT2 = sqrt(2)
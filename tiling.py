@@ -1,14 +1,26 @@
-from typing import Set
-from drawSvg import Drawing
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Set, Tuple, Union
+import math
 import os
-import yaml
+import pickle
 
 
-from quadratic_rational import QuadraticRational, sqrt
+from quadratic_rational import QuadraticInteger, QuadraticRational, SQRT2
+
+_MINUS_SQRT2 = -SQRT2
+_SQRT2_FLOAT = SQRT2.value
+# scale of the projection from the hyperboloid to the Poincaré disk
+_FOURTH_ROOT_2 = 2 ** 0.25
+
+
+def _float_key(x: float, y: float) -> Tuple[int, int]:
+	# a grid of step 2 ** -4 on the hyperboloid (x, y), well below the spacing of the vertices
+	# but coarse enough for most float reflections to round onto the key of the exact vertex
+	return (round(x * 2 ** 4), round(y * 2 ** 4))
 
 
 class Point:
-	__slots__ = ("x", "y", "z")
+	__slots__ = ("x", "y", "z", "_xyz", "_xy_key", "_key", "_hash", "_id")
 
 	def __init__(self, x: QuadraticRational, y: QuadraticRational, z: QuadraticRational):
 
@@ -16,9 +28,17 @@ class Point:
 		self.y = QuadraticRational.convert(y)
 		self.z = QuadraticRational.convert(z)
 
+		self._xyz = (self.x.value, self.y.value, self.z.value)
+		self._xy_key = _float_key(self._xyz[0], self._xyz[1])
+
+		# z is determined by x and y on the hyperboloid
+		self._key = (self.x._canonical_tuple(), self.y._canonical_tuple())
+		self._hash = hash(self._key)
+		self._id = None
+
 	@property
 	def poincare(self) -> complex:
-		return (self.x.value + self.y.value * 1j) * 2 ** 0.25 / (1 + self.z.value)	
+		return (self._xyz[0] + self._xyz[1] * 1j) * _FOURTH_ROOT_2 / (1 + self._xyz[2])
 	
 	@property
 	def x_euclid(self) -> float:
@@ -29,15 +49,10 @@ class Point:
 		return self.poincare.imag
 
 	def __eq__(self, other: "Point") -> bool:
-		return self.x == other.x and self.y == other.y
+		return self is other or self._key == other._key
 
 	def __hash__(self) -> int:
-		return hash(
-			(
-				self.x, 
-				self.y,
-			)
-		)	
+		return self._hash
 
 	def __repr__(self) -> str:
 		return f"Point(x={self.x_euclid.value * 2 ** 0.25}, y={self.y_euclid.value * 2 ** 0.25})"
@@ -55,19 +70,29 @@ class Point:
 
 
 class Line:
-	__slots__ = ("x", "y", "z")
+	__slots__ = ("x", "y", "z", "_norm", "_r_euclid", "_poincare")
 
 	def __init__(self, x: QuadraticRational, y: QuadraticRational, z: QuadraticRational):
 		self.x = x
 		self.y = y
 		self.z = z
 
+		self._norm = None
+		self._r_euclid = None
+		self._poincare = None
+
 	@property
 	def norm(self) -> QuadraticRational:
-		return (self.x ** 2 + self.y ** 2) * sqrt(2) - self.z ** 2
+		if self._norm is None:
+			self._norm = QuadraticRational(*_sum_of_products((self.x, self.x, SQRT2), (self.y, self.y, SQRT2), (self.z, self.z, -1)))
+
+		return self._norm
 
 	def product(self, point: Point) -> QuadraticRational:
-		return self.z * point.z - (self.x * point.x + self.y * point.y) * sqrt(2)
+		return QuadraticRational(*self._product_terms(point))
+
+	def _product_terms(self, point: Point) -> Tuple[QuadraticInteger, int]:
+		return _sum_of_products((self.z, point.z, 1), (self.x, point.x, _MINUS_SQRT2), (self.y, point.y, _MINUS_SQRT2))
 
 	def __contains__(self, point: Point) -> bool:
 		return self.product(point) == 0
@@ -75,31 +100,39 @@ class Line:
 	@staticmethod
 	def from_points(point_1: Point, point_2: Point) -> "Line":
 		return Line(
-			x=point_1.y * point_2.z - point_1.z * point_2.y,
-			y=point_1.z * point_2.x - point_1.x * point_2.z,
-			z=(point_1.y * point_2.x - point_1.x * point_2.y) * sqrt(2),
+			x=QuadraticRational(*_sum_of_products((point_1.y, point_2.z, 1), (point_1.z, point_2.y, -1))),
+			y=QuadraticRational(*_sum_of_products((point_1.z, point_2.x, 1), (point_1.x, point_2.z, -1))),
+			z=QuadraticRational(*_sum_of_products((point_1.y, point_2.x, SQRT2), (point_1.x, point_2.y, _MINUS_SQRT2))),
 		)
 
 	def reflection(self, point: Point) -> Point:
-		factor = self.product(point) / self.norm
+		# product / norm without building the product as a fraction of its own
+		product_numerator, product_denominator = self._product_terms(point)
+		factor = QuadraticRational(product_numerator * self.norm.denominator, self.norm.numerator * product_denominator)
 
-		x = point.x + 2 * self.x * factor
-		y = point.y + 2 * self.y * factor
-		z = point.z + 2 * self.z * factor
+		x = _reflect_coordinate(point.x, self.x, factor)
+		y = _reflect_coordinate(point.y, self.y, factor)
+		z = _reflect_coordinate(point.z, self.z, factor)
 
 		return type(point)(x, y, z)
 
 	@property
 	def r_euclid(self) -> float:
-		assert self.z != 0
+		if self._r_euclid is None:
+			assert self.z != 0
+
+			self._r_euclid = (((self.x / self.z) ** 2 + (self.y / self.z) ** 2) * SQRT2 - 1).value ** 0.5
 
-		return (((self.x / self.z) ** 2 + (self.y / self.z) ** 2) * sqrt(2) - 1).value ** 0.5
+		return self._r_euclid
 
 	@property
 	def poincare(self) -> complex:
-		assert self.z != 0
+		if self._poincare is None:
+			assert self.z != 0
 
-		return (self.x.value + self.y.value * 1j) * 2 ** 0.25 / self.z.value
+			self._poincare = (self.x.value + self.y.value * 1j) * _FOURTH_ROOT_2 / self.z.value
+
+		return self._poincare
 
 	@property
 	def x_euclid(self) -> float:
@@ -121,31 +154,125 @@ class Line:
 		)
 
 
+def _sum_of_products(*terms: Tuple[QuadraticRational, QuadraticRational, Union[int, QuadraticInteger]]) -> Tuple[QuadraticInteger, int]:
+	# sum of a * b * scale over the terms (a, b, scale), as a numerator over a common denominator
+	# left for the caller to reduce once
+	denominator = math.lcm(*(a.denominator * b.denominator for a, b, _ in terms))
+	numerator = None
+
+	for a, b, scale in terms:
+		term = a.numerator * b.numerator * (scale * (denominator // (a.denominator * b.denominator)))
+		numerator = term if numerator is None else numerator + term
+
+	return numerator, denominator
+
+
+def _reflect_coordinate(coordinate: QuadraticRational, direction: QuadraticRational, factor: QuadraticRational) -> QuadraticRational:
+	numerator = (
+		coordinate.numerator * (direction.denominator * factor.denominator)
+		+ direction.numerator * factor.numerator * (2 * coordinate.denominator)
+	)
+	denominator = coordinate.denominator * direction.denominator * factor.denominator
+
+	return QuadraticRational(numerator, denominator)
+
+
+def _reflect_floats(point_1: Tuple[float, float, float], point_2: Tuple[float, float, float], point: Tuple[float, float, float]) -> Tuple[float, float, float]:
+	# Line.from_points(point_1, point_2).reflection(point) in floating point
+	x_1, y_1, z_1 = point_1
+	x_2, y_2, z_2 = point_2
+	x, y, z = point
+
+	line_x = y_1 * z_2 - z_1 * y_2
+	line_y = z_1 * x_2 - x_1 * z_2
+	line_z = (y_1 * x_2 - x_1 * y_2) * _SQRT2_FLOAT
+
+	product = line_z * z - (line_x * x + line_y * y) * _SQRT2_FLOAT
+	norm = (line_x ** 2 + line_y ** 2) * _SQRT2_FLOAT - line_z ** 2
+	factor = 2 * product / norm
+
+	return (x + line_x * factor, y + line_y * factor, z + line_z * factor)
+
+
 def cosh_distance(point_1: Point, point_2: Point) -> QuadraticRational:
-	return point_1.z * point_2.z - (point_1.x * point_2.x + point_1.y * point_2.y) * sqrt(2)		
+	return point_1.z * point_2.z - (point_1.x * point_2.x + point_1.y * point_2.y) * SQRT2		
+
+
+def _is_reflection(point_1: Point, point_2: Point, point: Point, image: Point) -> bool:
+	# the only other point at the same distances from point_1 and point_2 as point is its
+	# reflection in the line through them
+	return image != point and _equidistant(point_1, point, image) and _equidistant(point_2, point, image)
+
+
+def _equidistant(centre: Point, point_1: Point, point_2: Point) -> bool:
+	# cosh_distance(centre, point_1) - cosh_distance(centre, point_2) has a zero numerator
+	numerator, _ = _sum_of_products(
+		(centre.z, point_1.z, 1), (centre.x, point_1.x, _MINUS_SQRT2), (centre.y, point_1.y, _MINUS_SQRT2),
+		(centre.z, point_2.z, -1), (centre.x, point_2.x, SQRT2), (centre.y, point_2.y, SQRT2),
+	)
+
+	return not any(numerator.coefficients)
+
+
+@lru_cache(maxsize=None)
+def _num_tiles(depth: int) -> int:
+	# 3 * sqrt(3) * ((2 + sqrt(3)) ** depth - (2 - sqrt(3)) ** depth) == 9 * a[depth],
+	# where a[n] = 4 * a[n - 1] - a[n - 2], a[0] = 0, a[1] = 2
+	a = [0, 2]
+	for _ in range(depth - 1):
+		a.append(4 * a[-1] - a[-2])
+
+	return 9 * a[depth]
 
 
 class Vertex(Point):
-	pass
+	__slots__ = ("_xe", "_ye")
+
+	def __init__(self, x: QuadraticRational, y: QuadraticRational, z: QuadraticRational):
+		super().__init__(x, y, z)
+
+		poincare = super().poincare
+		self._xe = poincare.real
+		self._ye = poincare.imag
+
+	@property
+	def x_euclid(self) -> float:
+		return self._xe
+
+	@property
+	def y_euclid(self) -> float:
+		return self._ye
+
+
+def _edge_key(vertex_1: Vertex, vertex_2: Vertex) -> Tuple[int, int]:
+	id_1, id_2 = vertex_1._id, vertex_2._id
+	return (id_1, id_2) if id_1 < id_2 else (id_2, id_1)
+
+
+def _tile_key(vertex_1: Vertex, vertex_2: Vertex, vertex_3: Vertex) -> Tuple[int, int, int]:
+	return tuple(sorted((vertex_1._id, vertex_2._id, vertex_3._id)))
 
 
 class Edge:
-	__slots__ = ("vertex_1", "vertex_2")
+	__slots__ = ("vertex_1", "vertex_2", "_vertex_set", "_hash")
 
 	def __init__(self, vertex_1: Vertex, vertex_2: Vertex):
 		
 		self.vertex_1 = vertex_1
 		self.vertex_2 = vertex_2
+
+		self._vertex_set = frozenset((vertex_1, vertex_2))
+		self._hash = hash(self._vertex_set)
 	
 	@property
 	def vertices(self) -> Set[Vertex]:
 		return {self.vertex_1, self.vertex_2}
 
 	def __eq__(self, other):
-		return self.vertices == other.vertices
+		return self is other or self._vertex_set == other._vertex_set
 
 	def __hash__(self) -> int:
-		return hash(self.vertex_1) + hash(self.vertex_2)
+		return self._hash
 
 	def to_json(self):
 		return [self.vertex_1, self.vertex_2]
@@ -156,13 +283,16 @@ class Edge:
 
 
 class Tile:
-	__slots__ = ("vertex_1", "vertex_2", "vertex_3")
+	__slots__ = ("vertex_1", "vertex_2", "vertex_3", "_vertex_set", "_hash")
 
 	def __init__(self, vertex_1: Vertex, vertex_2: Vertex, vertex_3: Vertex):
 		self.vertex_1 = vertex_1
 		self.vertex_2 = vertex_2
 		self.vertex_3 = vertex_3
 
+		self._vertex_set = frozenset((vertex_1, vertex_2, vertex_3))
+		self._hash = hash(self._vertex_set)
+
 	def toDrawables(self, elements, **kwargs):
 		path = elements.Path(**kwargs)
 		self.drawToPath(path)
@@ -170,42 +300,75 @@ class Tile:
 		return (path,)
 
 	def drawToPath(self, path):
-		path.M(self.vertex_1.x_euclid, self.vertex_1.y_euclid)
+		path.M(self.vertex_1._xe, self.vertex_1._ye)
+		for r, cw, end in self._arcs():
+			path.A(r, r, 0, 0, cw, end._xe, end._ye)
+
+	def to_svg_path(self, radii: Optional[Dict[FrozenSet[Vertex], float]] = None) -> str:
+		# same path data drawSvg writes for drawToPath, whose y axis points up
+		commands = [f"M{self.vertex_1._xe},{-self.vertex_1._ye}"]
+		for r, cw, end in self._arcs(radii):
+			commands.append(f"A{r},{r},0,0,{cw},{end._xe},{-end._ye}")
+		commands.append("Z")
+
+		return " ".join(commands)
+
+	def _arcs(self, radii: Optional[Dict[FrozenSet[Vertex], float]] = None):
+		# radii memoises the arc radius of each edge by its pair of vertices,
+		# every interior edge being drawn once for each of its two tiles
 		for start, end in [(self.vertex_1, self.vertex_2), (self.vertex_2, self.vertex_3), (self.vertex_3, self.vertex_1)]:
-			r = Line.from_points(start, end).r_euclid
-			cw = start.x_euclid * end.y_euclid > start.y_euclid * end.x_euclid
-			path.A(r, r, 0, 0, cw, end.x_euclid, end.y_euclid)
+			if radii is None:
+				r = Line.from_points(start, end).r_euclid
+			else:
+				key = frozenset((start, end))
+				if key not in radii:
+					radii[key] = Line.from_points(start, end).r_euclid
+				r = radii[key]
+
+			cw = 1 if start._xe * end._ye > start._ye * end._xe else 0
+			yield r, cw, end
 	
 	@property
 	def vertices(self) -> Set[Vertex]:
 		return {self.vertex_1, self.vertex_2, self.vertex_3}
 
 	def __eq__(self, other):
-		return self.vertices == other.vertices	
+		return self is other or self._vertex_set == other._vertex_set
 
 	def __hash__(self):
-		return hash(self.vertex_1) + hash(self.vertex_2) + hash(self.vertex_3)
+		return self._hash
 
 	def to_json(self):
 		return [self.vertex_1.to_json(), self.vertex_2.to_json(), self.vertex_3.to_json()]
 
 	@classmethod
-	def from_json(cls, data):
-		return cls(Vertex.from_json(data[0]), Vertex.from_json(data[1]), Vertex.from_json(data[2]))
+	def from_json(cls, data, vertices: Optional[Dict[Vertex, Vertex]] = None):
+		tile_vertices = [Vertex.from_json(vertex_data) for vertex_data in data]
+
+		if vertices is not None:
+			tile_vertices = [vertices.setdefault(vertex, vertex) for vertex in tile_vertices]
+
+		return cls(*tile_vertices)
 
 
 class Tiling:
 	def __init__(self, vertex_1: Vertex, vertex_2: Vertex, vertex_3: Vertex):
 		self._vertices = {}
+		self._vertices_by_key = {}
+		# edges and tiles are stored by the ids of their vertices in this tiling, so an Edge
+		# or a Tile is only built the first time it is added
 		self._edges = {}
 		self._tiles = {}
 
+		# the keys of the tiles of each edge
 		self._edges_to_tiles = {}
 
 		self._tiles_to_colours = {}
-		self._vertices_to_colours = {}
+		# colours of the vertices, indexed by their ids
+		self._vertex_colours = []
 	
-		self._boundary = [vertex_1, vertex_2, vertex_3]
+		# vertex ids belong to the tiling, so the starting vertices are copied rather than shared
+		self._boundary = [Vertex(vertex.x, vertex.y, vertex.z) for vertex in (vertex_1, vertex_2, vertex_3)]
 
 		self._colour_values = ["#ffffff", "#000000", "#cc6600", "#66cc00"]
 
@@ -213,99 +376,138 @@ class Tiling:
 
 	def _populate_data(self):
 		for index, vertex in enumerate(self._boundary):
-			self._vertices[vertex] = vertex
-			
-			edge = Edge(*tuple(set(self._boundary) - {vertex}))
-			self._edges[edge] = edge
+			self._add_vertex(vertex)
+			self._vertex_colours[vertex._id] = index + 1
 
-			self._vertices_to_colours[vertex] = index + 1
+		tile_key = _tile_key(*self._boundary)
+		self._tiles[tile_key] = Tile(*self._boundary)
 
-		tile = Tile(*self._boundary)
-		self._tiles[tile] = tile
+		self._tiles_to_colours[tile_key] = 0
 
-		self._tiles_to_colours[tile] = 0
+		for index in range(3):
+			vertex_1, vertex_2 = self._boundary[(index + 1) % 3], self._boundary[(index + 2) % 3]
+			edge_key = _edge_key(vertex_1, vertex_2)
 
-		for edge in self._edges:
-			self._edges_to_tiles[edge] = {tile}
+			self._edges[edge_key] = Edge(vertex_1, vertex_2)
+			self._edges_to_tiles[edge_key] = [tile_key, None]
 
 	def _build_new_tile(self, vertex_1: Vertex, vertex_2: Vertex) -> Vertex:
-		edge = self._edges[Edge(vertex_1, vertex_2)]
+		edge_key = _edge_key(vertex_1, vertex_2)
 		
-		inner_tile = tuple(self._edges_to_tiles[edge])[0]
-		inner_vertex = tuple(inner_tile.vertices - {vertex_1, vertex_2})[0]
+		# the edge is on the boundary, so it has a single tile
+		inner_tile_key = self._edges_to_tiles[edge_key][0]
+		inner_tile = self._tiles[inner_tile_key]
+		for inner_vertex in (inner_tile.vertex_1, inner_tile.vertex_2, inner_tile.vertex_3):
+			if inner_vertex is not vertex_1 and inner_vertex is not vertex_2:
+				break
+
+		# neighbouring vertices differ by more than 1.2 in the hyperboloid x or y, so no two vertices
+		# share a float key. The float reflection grows less accurate with the depth though (its error is
+		# about 1e-5 typically and 2e-2 at worst at depth 6, but reaches 10 at depth 7), so a hit is
+		# only a candidate and is confirmed exactly, which is much cheaper than reflecting exactly.
+		# New vertices, and reflections rounding onto another key, go through the exact reflection
+		x, y, _ = _reflect_floats(vertex_1._xyz, vertex_2._xyz, inner_vertex._xyz)
+		reflected_vertex = self._vertices_by_key.get(_float_key(x, y))
 
-		reflected_vertex = Line.from_points(vertex_1, vertex_2).reflection(inner_vertex)
+		if reflected_vertex is not None and not _is_reflection(vertex_1, vertex_2, inner_vertex, reflected_vertex):
+			reflected_vertex = None
 
-		reflected_vertex = self._add_vertex(reflected_vertex)
+		if reflected_vertex is None:
+			reflected_vertex = self._add_vertex(Line.from_points(vertex_1, vertex_2).reflection(inner_vertex))
 
-		self._add_edge(Edge(vertex_1, reflected_vertex))
-		self._add_edge(Edge(vertex_2, reflected_vertex))
+		edge_key_1 = self._add_edge(vertex_1, reflected_vertex)
+		edge_key_2 = self._add_edge(vertex_2, reflected_vertex)
 
-		new_tile = self._add_tile(Tile(vertex_1, reflected_vertex, vertex_2))
+		new_tile_key = self._add_tile(vertex_1, reflected_vertex, vertex_2, edge_key_1, edge_key_2, edge_key)
 		
-		self._vertices_to_colours[reflected_vertex] = self._vertices_to_colours[inner_vertex]
-		self._tiles_to_colours[new_tile] = self._vertices_to_colours[inner_vertex] ^ self._tiles_to_colours[inner_tile]
+		colour = self._vertex_colours[inner_vertex._id]
+		self._vertex_colours[reflected_vertex._id] = colour
+		self._tiles_to_colours[new_tile_key] = colour ^ self._tiles_to_colours[inner_tile_key]
 
 		return reflected_vertex
 
 	def _add_vertex(self, vertex: Vertex) -> Vertex:
 		if vertex not in self._vertices:
+			vertex._id = len(self._vertices)
 			self._vertices[vertex] = vertex
+			self._vertices_by_key[vertex._xy_key] = vertex
+			self._vertex_colours.append(None)
 
 		return self._vertices[vertex]
 
-	def _add_edge(self, edge: Edge):
-		if edge not in self._edges:
-			self._edges[edge] = edge
-			self._edges_to_tiles[edge] = set()
-		
-	def _add_tile(self, tile: Tile):
-		if tile not in self._tiles:
-			self._tiles[tile] = tile
+	def _add_edge(self, vertex_1: Vertex, vertex_2: Vertex) -> Tuple[int, int]:
+		key = _edge_key(vertex_1, vertex_2)
 
-		tile = self._tiles[tile]
-		
-		edge_1 = self._edges[Edge(tile.vertex_2, tile.vertex_3)]
-		edge_2 = self._edges[Edge(tile.vertex_3, tile.vertex_1)]
-		edge_3 = self._edges[Edge(tile.vertex_1, tile.vertex_2)]
+		if key not in self._edges:
+			self._edges[key] = Edge(vertex_1, vertex_2)
+			# an edge is shared by at most two tiles
+			self._edges_to_tiles[key] = [None, None]
+
+		return key
 		
-		self._edges_to_tiles[edge_1].add(tile)
-		self._edges_to_tiles[edge_2].add(tile)
-		self._edges_to_tiles[edge_3].add(tile)
+	def _add_tile(self, vertex_1: Vertex, vertex_2: Vertex, vertex_3: Vertex, edge_key_1: Tuple[int, int], edge_key_2: Tuple[int, int], edge_key_3: Tuple[int, int]) -> Tuple[int, int, int]:
+		# the edge keys are those of the edges of the tile, as returned by _add_edge
+		key = _tile_key(vertex_1, vertex_2, vertex_3)
+
+		if key not in self._tiles:
+			self._tiles[key] = Tile(vertex_1, vertex_2, vertex_3)
+
+		self._register_tile(key, edge_key_1, edge_key_2, edge_key_3)
+
+		return key
 
-		return tile
+	def _register_tile(self, tile_key: Tuple[int, int, int], edge_key_1: Tuple[int, int], edge_key_2: Tuple[int, int], edge_key_3: Tuple[int, int]):
+		for edge_key in (edge_key_1, edge_key_2, edge_key_3):
+			tiles = self._edges_to_tiles[edge_key]
+
+			if tiles[0] is None:
+				tiles[0] = tile_key
+			elif tiles[0] != tile_key:
+				assert tiles[1] is None or tiles[1] == tile_key, "an edge is shared by at most two tiles"
+				tiles[1] = tile_key
 	
 	def _save_data(self, depth: int, path: str):
-		with open(os.path.join(path, 'logo-depth-{}-data.yaml'.format(depth)), 'w') as f:
-			yaml.safe_dump([(key.to_json(), int(value)) for key, value in self._tiles_to_colours.items()], f, indent=2)
+		with open(os.path.join(path, 'logo-depth-{}-data.pkl'.format(depth)), 'wb') as f:
+			pickle.dump([(self._tiles[key].to_json(), int(value)) for key, value in self._tiles_to_colours.items()], f, protocol=5)
 
-	def create_tiles(self, depth: int):
-		if depth == 0:
-			self._save_data(depth, path="images")
-			return
+	def create_tiles(self, depth: int, save_all_depths: bool = False):
+		# each depth contains all tiles of the previous ones, so by default only the last one is saved
+		if save_all_depths or depth == 0:
+			self._save_data(0, path="images")
 
-		self.create_tiles(depth=depth-1)
-		
+		for current_depth in range(1, depth + 1):
+			self._populate_depth(current_depth)
+
+			if save_all_depths or current_depth == depth:
+				self._save_data(current_depth, path="images")
+
+			print(f"Populated, found {len(self._tiles)} tiles")
+
+	def _populate_depth(self, depth: int):
 		print(f"Populating depth {depth}...")
 		new_boundary = [self._build_new_tile(self._boundary[0], self._boundary[-1])]
 		index = 0
 
-		counter = 0
-		num_tiles = (3 * sqrt(3) * ((2 + sqrt(3)) ** depth - (2 - sqrt(3)) ** depth)).as_int()
+		boundary_set = set(self._boundary)
+		new_boundary_set = set(new_boundary)
+
+		# the first tile of the depth is already built
+		counter = 1
+		num_tiles = _num_tiles(depth)
 
 		while True:
 			new_vertex = self._build_new_tile(new_boundary[-1], self._boundary[index])
 			counter += 1
-			print(f"created {counter} / {num_tiles} tiles...", end="\r")
 
-			if new_vertex in self._boundary:
+			if counter & 1023 == 0 or counter == num_tiles:
+				print(f"created {counter} / {num_tiles} tiles...", end="\r")
+
+			if new_vertex in boundary_set:
 				index += 1
-			elif new_vertex in new_boundary:
+			elif new_vertex in new_boundary_set:
 				break
 			else:
 				new_boundary.append(new_vertex)
+				new_boundary_set.add(new_vertex)
 
 		self._boundary = new_boundary
-		self._save_data(depth, path="images")
-
-		print(f"Populated, found {len(self._tiles)} tiles")